@@ -2,7 +2,11 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import os
 from io import BytesIO
+from tabela import exibir_tabela_paginada
+from cache_resultados import CacheResultados, hash_conteudo, gerar_chave
+from processamento import carregar_dados, aplicar_filtros, calcular_percentis, calcular_score
 
 # Configuração inicial
 st.set_page_config(page_title="Análise Fundamentalista", layout="wide")
@@ -29,31 +33,36 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Cache de resultados compartilhado entre todas as sessões do servidor
+@st.cache_resource
+def obter_cache():
+    return CacheResultados(diretorio=os.environ.get("ANALISE_CACHE_DIR"))
+
+cache = obter_cache()
+
 # Leitura do arquivo
 file = st.file_uploader("📁 Faça upload do arquivo .xlsx", type=["xlsx"])
 
 if file:
     try:
-        df = pd.read_excel(file)
+        conteudo = file.getvalue()
+        hash_arquivo = hash_conteudo(conteudo)
         
-        # Limpeza dos dados
+        # Limpeza dos dados (reaproveitada se o mesmo arquivo já foi processado)
         st.subheader("🧹 Pré-processamento dos Dados")
-        
-        # Remover linhas completamente vazias
-        df = df.dropna(how='all')
+        df = cache.obter_ou_calcular(
+            gerar_chave("dados", hash_arquivo),
+            lambda: carregar_dados(conteudo)
+        )
         
         # Identificar colunas numéricas
         numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
         
-        # Tratamento de valores infinitos e outliers
-        for col in numeric_cols:
-            df[col] = df[col].replace([np.inf, -np.inf], np.nan)
-            
-            # Winsorização para outliers extremos (opcional)
-            if df[col].nunique() > 10:  # Apenas para colunas com vários valores
-                q_low = df[col].quantile(0.01)
-                q_hi = df[col].quantile(0.99)
-                df[col] = df[col].clip(lower=q_low, upper=q_hi)
+        # Percentis de todos os indicadores, calculados uma vez por arquivo
+        percentis = cache.obter_ou_calcular(
+            gerar_chave("percentis", hash_arquivo),
+            lambda: calcular_percentis(df, numeric_cols)
+        )
         
         # Mostrar dados processados
         with st.expander("Visualizar dados processados"):
@@ -92,38 +101,31 @@ if file:
             crescimento_min = st.number_input("Crescimento Mínimo (%)", value=10.0)
         
         # Aplicar filtros
-        filtered_df = df.copy()
-        
-        # Verificar se as colunas existem antes de filtrar
-        if 'P/L' in filtered_df.columns:
-            filtered_df = filtered_df[(filtered_df['P/L'] >= pl_min) & (filtered_df['P/L'] <= pl_max)]
-        
-        if 'P/VP' in filtered_df.columns:
-            filtered_df = filtered_df[(filtered_df['P/VP'] >= pvp_min) & (filtered_df['P/VP'] <= pvp_max)]
-        
-        if 'Div.Yield' in filtered_df.columns:
-            filtered_df = filtered_df[(filtered_df['Div.Yield']*100 >= div_min) & (filtered_df['Div.Yield']*100 <= div_max)]
-        
-        if 'ROE' in filtered_df.columns:
-            filtered_df = filtered_df[(filtered_df['ROE']*100 >= roe_min) & (filtered_df['ROE']*100 <= roe_max)]
-        
-        if 'Liq.2meses' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['Liq.2meses'] >= liquidez_min*1e6]
-        elif 'Liquidez' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['Liquidez'] >= liquidez_min*1e6]
-        
-        if 'Cresc. Rec.5a' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['Cresc. Rec.5a']*100 >= crescimento_min]
+        filtros = {
+            'pl_min': pl_min, 'pl_max': pl_max,
+            'pvp_min': pvp_min, 'pvp_max': pvp_max,
+            'div_min': div_min, 'div_max': div_max,
+            'roe_min': roe_min, 'roe_max': roe_max,
+            'liquidez_min': liquidez_min,
+            'crescimento_min': crescimento_min
+        }
+        chave_filtros = gerar_chave("filtros", hash_arquivo, filtros)
+        filtered_df = cache.obter_ou_calcular(
+            chave_filtros,
+            lambda: aplicar_filtros(df, filtros)
+        )
         
         # Mostrar resultados dos filtros
         st.write(f"🔎 {len(filtered_df)} ações encontradas com os critérios especificados")
         
         if not filtered_df.empty:
-            st.dataframe(
-                filtered_df.style.background_gradient(
-                    subset=['P/L', 'P/VP', 'Div.Yield', 'ROE'], 
-                    cmap='Greens'
-                ),
+            exibir_tabela_paginada(
+                filtered_df,
+                colunas_gradiente=['P/L', 'P/VP', 'Div.Yield', 'ROE'],
+                cmap='Greens',
+                key="filtros",
+                cache=cache,
+                chave_cache=chave_filtros,
                 height=400
             )
         else:
@@ -164,19 +166,22 @@ if file:
             )
             weights[col] = weight
         
+        # Tipo de normalização dos indicadores
+        tipo_normalizacao = st.radio(
+            "Normalização dos indicadores",
+            ["Mín-máx", "Percentil (robusta a outliers)"],
+            horizontal=True
+        )
+        normalizacao = 'percentil' if tipo_normalizacao.startswith("Percentil") else 'minmax'
+        
         # Cálculo do score
         st.subheader("🧮 Calculando Scores")
         
-        score_df = pd.DataFrame()
-        for col in selected_cols:
-            if df[col].nunique() > 1:  # Apenas normalizar se houver variação
-                normalized = (df[col] - df[col].min()) / (df[col].max() - df[col].min())
-                score_df[col] = normalized * weights.get(col, 0)
-            else:
-                score_df[col] = 0  # Se não houver variação, não contribui para o score
-        
-        df['Score'] = score_df.sum(axis=1)
-        df_sorted = df.sort_values(by="Score", ascending=False)
+        chave_score = gerar_chave("score", hash_arquivo, selected_cols, weights, normalizacao)
+        df_sorted = cache.obter_ou_calcular(
+            chave_score,
+            lambda: calcular_score(df, selected_cols, weights, normalizacao=normalizacao, percentis=percentis)
+        )
         
         # Visualização dos resultados
         st.subheader("📊 Resultados da Análise")
@@ -185,12 +190,17 @@ if file:
         tab1, tab2, tab3 = st.tabs(["🏆 Ranking", "📈 Visualizações", "🔍 Análise Detalhada"])
         
         with tab1:
-            st.write("Top 20 ações por score fundamentalista")
-            st.dataframe(
-                df_sorted.head(20).style.background_gradient(
-                    subset=['Score'], 
-                    cmap='Greens'
-                ),
+            st.write("Ranking completo por score fundamentalista (do maior para o menor score, a menos que outra ordenação seja escolhida)")
+            exibir_tabela_paginada(
+                df_sorted,
+                colunas_gradiente=['Score'],
+                cmap='Greens',
+                key="ranking",
+                cache=cache,
+                chave_cache=chave_score,
+                ordenar_por='Score',
+                ascendente=False,
+                tamanho_pagina=20,
                 height=800
             )
         
@@ -263,6 +273,12 @@ if file:
             ax3.tick_params(axis='x', rotation=45)
             st.pyplot(fig3)
             
+            # Posição da ação em cada indicador em relação às demais
+            if indicadores:
+                st.write("Percentil da ação em cada indicador (0 = menor valor, 100 = maior)")
+                percentis_acao = percentis.loc[detalhes.name, indicadores] * 100
+                st.bar_chart(percentis_acao)
+            
             # Tabela com todos os indicadores
             with st.expander("Ver todos os indicadores"):
                 st.dataframe(detalhes)
@@ -300,6 +316,10 @@ if file:
             
             **Score Fundamentalista**: Pontuação composta que considera múltiplos indicadores financeiros. 
             Quanto maior, melhor o desempenho fundamentalista da ação.
+            
+            **Normalização por percentil**: cada indicador é convertido na posição da ação em relação às demais,
+            de forma que um único valor extremo não comprime a nota das outras ações. Indicadores sem valor
+            entram como a mediana (percentil 50).
             """)
     
     except Exception as e:
@@ -307,6 +327,13 @@ if file:
 else:
     st.info("Por favor, faça upload de um arquivo Excel para começar a análise.")
 
+# Estatísticas do cache compartilhado
+with st.sidebar.expander("🗄️ Cache de resultados"):
+    stats = cache.estatisticas()
+    st.write(f"Itens em memória: {stats['itens']}")
+    st.write(f"Memória usada: {stats['memoria_usada'] / 1e6:.1f} MB de {stats['limite_memoria'] / 1e6:.0f} MB")
+    st.write(f"Acertos: {stats['acertos']} | Falhas: {stats['falhas']} ({stats['taxa_acerto']:.0%} de acerto)")
+
 # Rodapé
 st.markdown("---")
 st.markdown("Desenvolvido com Streamlit | Análise Fundamentalista de Ações")
@@ -0,0 +1,263 @@
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+# Limite padrão de memória do cache (em bytes)
+LIMITE_MEMORIA_PADRAO = 512 * 1024 * 1024
+
+# Limite padrão do cache em disco (em bytes)
+LIMITE_DISCO_PADRAO = 2 * 1024 * 1024 * 1024
+
+# Arquivos temporários mais antigos que isso são restos de gravações interrompidas
+IDADE_MAXIMA_TEMPORARIO = 60 * 60
+
+# Marca de "não encontrado" (None pode ser um resultado válido)
+_AUSENTE = object()
+
+
+def hash_conteudo(conteudo):
+    """Hash SHA-256 do conteúdo do arquivo enviado."""
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def gerar_chave(*partes):
+    """Monta uma chave estável a partir do hash do arquivo e da configuração."""
+    texto = json.dumps(partes, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+def tamanho_em_bytes(valor):
+    """Estimativa do espaço ocupado por um resultado em memória."""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, (tuple, list)):
+        return sum(tamanho_em_bytes(v) for v in valor)
+    if isinstance(valor, dict):
+        return sum(tamanho_em_bytes(v) for v in valor.values())
+    return sys.getsizeof(valor)
+
+
+class CacheResultados:
+    """Cache LRU de resultados compartilhado entre as sessões do processo.
+
+    Os resultados ficam em memória até o limite de bytes definido; os menos
+    usados recentemente são descartados primeiro. Se `diretorio` for informado,
+    cada resultado também é gravado em disco e recuperado de lá quando não
+    estiver mais em memória; o disco tem seu próprio limite de bytes e os
+    arquivos acessados há mais tempo (pela data de modificação) saem primeiro.
+    """
+
+    def __init__(self, limite_memoria=LIMITE_MEMORIA_PADRAO, diretorio=None,
+                 limite_disco=LIMITE_DISCO_PADRAO):
+        self.limite_memoria = limite_memoria
+        self.diretorio = diretorio
+        self.limite_disco = limite_disco
+        self.acertos = 0
+        self.falhas = 0
+        self.memoria_usada = 0
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+        self._trava_disco = threading.Lock()
+        self._calculos = {}  # Uma trava por chave sendo calculada
+
+        if self.diretorio:
+            os.makedirs(self.diretorio, exist_ok=True)
+            self._limpar_disco(remover_temporarios=True)
+
+    def __len__(self):
+        return len(self._itens)
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f"{chave}.pkl")
+
+    def _remover(self, caminho):
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+
+    def _ler_disco(self, chave):
+        if not self.diretorio:
+            return _AUSENTE
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'rb') as arquivo:
+                valor = pickle.load(arquivo)
+        except FileNotFoundError:
+            return _AUSENTE
+        except Exception:
+            # Arquivo corrompido: descartar e tratar como falha
+            self._remover(caminho)
+            return _AUSENTE
+
+        # Marcar como usado recentemente para a limpeza do disco
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+        return valor
+
+    def _gravar_disco(self, chave, valor):
+        if not self.diretorio:
+            return
+        # Cada gravação usa seu próprio temporário; o os.replace final é atômico
+        temporario = None
+        try:
+            with tempfile.NamedTemporaryFile(dir=self.diretorio, suffix=".tmp", delete=False) as arquivo:
+                temporario = arquivo.name
+                pickle.dump(valor, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporario, self._caminho(chave))
+        except Exception:
+            if temporario:
+                self._remover(temporario)
+            return
+        self._limpar_disco()
+
+    def _limpar_disco(self, remover_temporarios=False):
+        """Remove os arquivos usados há mais tempo até o disco caber no limite."""
+        with self._trava_disco:
+            arquivos = []
+            agora = time.time()
+            try:
+                entradas = list(os.scandir(self.diretorio))
+            except OSError:
+                return
+
+            for entrada in entradas:
+                try:
+                    info = entrada.stat()
+                except OSError:
+                    continue
+                if entrada.name.endswith(".pkl"):
+                    arquivos.append((info.st_mtime, info.st_size, entrada.path))
+                elif remover_temporarios and entrada.name.endswith(".tmp") \
+                        and agora - info.st_mtime > IDADE_MAXIMA_TEMPORARIO:
+                    self._remover(entrada.path)
+
+            total = sum(tamanho for _, tamanho, _ in arquivos)
+            for _, tamanho, caminho in sorted(arquivos):
+                if total <= self.limite_disco:
+                    break
+                self._remover(caminho)
+                total -= tamanho
+
+    def _guardar_em_memoria(self, chave, valor):
+        tamanho = tamanho_em_bytes(valor)
+        if tamanho > self.limite_memoria:
+            return  # Maior que o cache inteiro: não vale a pena guardar
+
+        if chave in self._itens:
+            self.memoria_usada -= self._itens.pop(chave)[1]
+        self._itens[chave] = (valor, tamanho)
+        self.memoria_usada += tamanho
+
+        # Descartar os itens menos usados até caber no limite
+        while self.memoria_usada > self.limite_memoria:
+            _, (_, tamanho_removido) = self._itens.popitem(last=False)
+            self.memoria_usada -= tamanho_removido
+
+    def _buscar(self, chave):
+        """Procura em memória e depois no disco, sem mexer nos contadores."""
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                return self._itens[chave][0]
+
+        # A leitura do disco fica fora da trava para não bloquear as outras sessões
+        valor = self._ler_disco(chave)
+
+        if valor is not _AUSENTE:
+            with self._trava:
+                # Outra sessão pode ter guardado a chave enquanto líamos o disco
+                if chave in self._itens:
+                    self._itens.move_to_end(chave)
+                    return self._itens[chave][0]
+                self._guardar_em_memoria(chave, valor)
+        return valor
+
+    def _contar(self, acerto):
+        with self._trava:
+            if acerto:
+                self.acertos += 1
+            else:
+                self.falhas += 1
+
+    def obter(self, chave, padrao=None):
+        """Devolve o resultado guardado ou `padrao`, atualizando os contadores."""
+        valor = self._buscar(chave)
+        self._contar(valor is not _AUSENTE)
+        return padrao if valor is _AUSENTE else valor
+
+    def guardar(self, chave, valor):
+        """Guarda o resultado em memória e, se houver diretório, em disco."""
+        with self._trava:
+            self._guardar_em_memoria(chave, valor)
+        self._gravar_disco(chave, valor)
+
+    def obter_ou_calcular(self, chave, funcao):
+        """Devolve o resultado do cache ou calcula com `funcao` e guarda.
+
+        Os resultados são compartilhados entre sessões e não devem ser
+        alterados por quem os recebe.
+        """
+        valor = self._buscar(chave)
+        if valor is not _AUSENTE:
+            self._contar(True)
+            return valor
+
+        # Só uma sessão calcula cada chave; as demais esperam e leem o resultado
+        with self._trava:
+            trava_chave = self._calculos.setdefault(chave, threading.Lock())
+
+        with trava_chave:
+            try:
+                valor = self._buscar(chave)
+                if valor is not _AUSENTE:
+                    self._contar(True)
+                    return valor
+
+                self._contar(False)
+                valor = funcao()
+                self.guardar(chave, valor)
+                return valor
+            finally:
+                with self._trava:
+                    if self._calculos.get(chave) is trava_chave:
+                        del self._calculos[chave]
+
+    def limpar(self):
+        """Esvazia o cache em memória, apaga os arquivos em disco e zera os contadores."""
+        with self._trava:
+            self._itens.clear()
+            self.memoria_usada = 0
+            self.acertos = 0
+            self.falhas = 0
+
+        if self.diretorio:
+            with self._trava_disco:
+                for nome in os.listdir(self.diretorio):
+                    if nome.endswith(".pkl"):
+                        self._remover(os.path.join(self.diretorio, nome))
+
+    def estatisticas(self):
+        """Números de itens, memória usada, acertos e falhas do cache."""
+        with self._trava:
+            total = self.acertos + self.falhas
+            return {
+                'itens': len(self._itens),
+                'memoria_usada': self.memoria_usada,
+                'limite_memoria': self.limite_memoria,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': self.acertos / total if total else 0.0,
+            }
@@ -0,0 +1,118 @@
+import pandas as pd
+import numpy as np
+from io import BytesIO
+
+
+def carregar_dados(conteudo):
+    """Lê a planilha enviada e faz a limpeza dos dados."""
+    df = pd.read_excel(BytesIO(conteudo))
+
+    # Remover linhas completamente vazias
+    df = df.dropna(how='all')
+
+    # Identificar colunas numéricas
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+
+    # Tratamento de valores infinitos e outliers
+    for col in numeric_cols:
+        df[col] = df[col].replace([np.inf, -np.inf], np.nan)
+
+        # Winsorização para outliers extremos (opcional)
+        if df[col].nunique() > 10:  # Apenas para colunas com vários valores
+            q_low = df[col].quantile(0.01)
+            q_hi = df[col].quantile(0.99)
+            df[col] = df[col].clip(lower=q_low, upper=q_hi)
+
+    return df
+
+
+def aplicar_filtros(df, filtros):
+    """Aplica os filtros fundamentais configurados pelo usuário."""
+    filtered_df = df.copy()
+
+    # Verificar se as colunas existem antes de filtrar
+    if 'P/L' in filtered_df.columns:
+        filtered_df = filtered_df[(filtered_df['P/L'] >= filtros['pl_min']) & (filtered_df['P/L'] <= filtros['pl_max'])]
+
+    if 'P/VP' in filtered_df.columns:
+        filtered_df = filtered_df[(filtered_df['P/VP'] >= filtros['pvp_min']) & (filtered_df['P/VP'] <= filtros['pvp_max'])]
+
+    if 'Div.Yield' in filtered_df.columns:
+        filtered_df = filtered_df[(filtered_df['Div.Yield']*100 >= filtros['div_min']) & (filtered_df['Div.Yield']*100 <= filtros['div_max'])]
+
+    if 'ROE' in filtered_df.columns:
+        filtered_df = filtered_df[(filtered_df['ROE']*100 >= filtros['roe_min']) & (filtered_df['ROE']*100 <= filtros['roe_max'])]
+
+    if 'Liq.2meses' in filtered_df.columns:
+        filtered_df = filtered_df[filtered_df['Liq.2meses'] >= filtros['liquidez_min']*1e6]
+    elif 'Liquidez' in filtered_df.columns:
+        filtered_df = filtered_df[filtered_df['Liquidez'] >= filtros['liquidez_min']*1e6]
+
+    if 'Cresc. Rec.5a' in filtered_df.columns:
+        filtered_df = filtered_df[filtered_df['Cresc. Rec.5a']*100 >= filtros['crescimento_min']]
+
+    return filtered_df
+
+
+def calcular_percentis(df, colunas):
+    """Converte as colunas em percentis (0 a 1) com um único argsort vetorizado.
+
+    Empates recebem a média das posições. Valores vazios ou infinitos não
+    entram no ranking e continuam vazios no resultado; colunas com um único
+    valor válido ficam no meio da escala (0,5).
+    """
+    valores = df[colunas].to_numpy(dtype=float, copy=True)
+    valores[np.isinf(valores)] = np.nan
+    n = len(valores)
+
+    # Um único argsort para todas as colunas (os vazios vão para o final)
+    ordem = np.argsort(valores, axis=0, kind='stable')
+    ordenados = np.take_along_axis(valores, ordem, axis=0)
+    validos = ~np.isnan(ordenados)
+    n_validos = validos.sum(axis=0)
+
+    # Início e fim de cada grupo de valores empatados
+    posicoes = np.broadcast_to(np.arange(n)[:, None], ordenados.shape)
+    novo_grupo = np.ones(ordenados.shape, dtype=bool)
+    novo_grupo[1:] = ordenados[1:] != ordenados[:-1]
+    fim_grupo = np.ones(ordenados.shape, dtype=bool)
+    fim_grupo[:-1] = novo_grupo[1:]
+    inicio = np.maximum.accumulate(np.where(novo_grupo, posicoes, 0), axis=0)
+    fim = np.minimum.accumulate(np.where(fim_grupo, posicoes, n - 1)[::-1], axis=0)[::-1]
+
+    divisor = np.maximum(n_validos - 1, 1)
+    percentis_ordenados = np.where(n_validos > 1, (inicio + fim) / 2 / divisor, 0.5)
+    percentis_ordenados = np.where(validos, percentis_ordenados, np.nan)
+
+    percentis = np.empty_like(percentis_ordenados)
+    np.put_along_axis(percentis, ordem, percentis_ordenados, axis=0)
+    return pd.DataFrame(percentis, index=df.index, columns=colunas)
+
+
+def calcular_score(df, selected_cols, weights, normalizacao='minmax', percentis=None, valor_ausente=0.5):
+    """Calcula o score ponderado e devolve uma cópia ordenada pelo score.
+
+    Com `normalizacao='percentil'` cada indicador vira seu percentil, o que
+    impede que um único valor extremo comprima a nota das demais ações.
+    `percentis` pode trazer os percentis já calculados (por exemplo, do cache)
+    e indicadores ausentes recebem `valor_ausente` (por padrão, a mediana).
+    """
+    if normalizacao == 'percentil':
+        if percentis is None:
+            percentis = calcular_percentis(df, selected_cols)
+        normalizados = percentis.loc[df.index, selected_cols].fillna(valor_ausente)
+        pesos = np.array([weights.get(col, 0) for col in selected_cols], dtype=float)
+        score = pd.Series(normalizados.to_numpy() @ pesos, index=df.index)
+    else:
+        score_df = pd.DataFrame(index=df.index)
+        for col in selected_cols:
+            if df[col].nunique() > 1:  # Apenas normalizar se houver variação
+                normalized = (df[col] - df[col].min()) / (df[col].max() - df[col].min())
+                score_df[col] = normalized * weights.get(col, 0)
+            else:
+                score_df[col] = 0  # Se não houver variação, não contribui para o score
+        score = score_df.sum(axis=1)
+
+    resultado = df.copy()
+    resultado['Score'] = score
+    return resultado.sort_values(by="Score", ascending=False)
@@ -0,0 +1,154 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import matplotlib
+from functools import lru_cache
+from cache_resultados import gerar_chave
+
+# Número de tons usados no gradiente de cores (cada célula cai em um deles)
+NUM_TONS = 64
+
+
+@lru_cache(maxsize=None)
+def paleta_gradiente(cmap='Greens', num_tons=NUM_TONS):
+    """Gera as cores de fundo e de texto para cada tom do gradiente (uma vez por mapa)."""
+    mapa = matplotlib.colormaps[cmap]
+    rgba = mapa(np.linspace(0, 1, num_tons))
+
+    fundos = np.array([matplotlib.colors.rgb2hex(c) for c in rgba])
+
+    # Mesmo critério de luminância usado pelo Styler.background_gradient
+    rgb = np.where(rgba[:, :3] <= 0.03928, rgba[:, :3] / 12.92, ((rgba[:, :3] + 0.055) / 1.055) ** 2.4)
+    luminancia = 0.2126 * rgb[:, 0] + 0.7152 * rgb[:, 1] + 0.0722 * rgb[:, 2]
+    textos = np.where(luminancia < 0.408, '#f1f1f1', '#000000')
+
+    estilos = np.array([f"background-color: {f}; color: {t};" for f, t in zip(fundos, textos)])
+    return estilos
+
+
+def calcular_tons(df, colunas, num_tons=NUM_TONS):
+    """Calcula, uma única vez por coluna, o tom do gradiente de cada célula.
+
+    O mínimo e o máximo são tirados da coluna inteira, então a escala de cores
+    é a mesma em todas as páginas. Células vazias recebem -1 (sem estilo).
+    """
+    tons = {}
+    for col in colunas:
+        valores = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+        valores = np.where(np.isinf(valores), np.nan, valores)
+        validos = ~np.isnan(valores)
+
+        codigos = np.full(len(valores), -1, dtype=np.int16)
+        if validos.any():
+            vmin = np.nanmin(valores)
+            vmax = np.nanmax(valores)
+            if vmax > vmin:
+                escala = (valores[validos] - vmin) / (vmax - vmin)
+                codigos[validos] = np.minimum((escala * num_tons).astype(np.int16), num_tons - 1)
+            else:
+                codigos[validos] = 0
+        tons[col] = codigos
+    return tons
+
+
+def paginar(df, pagina, tamanho_pagina, ordenar_por=None, ascendente=True):
+    """Ordena o DataFrame no servidor e devolve as posições das linhas da página."""
+    if ordenar_por is not None and ordenar_por in df.columns:
+        # Ordena só a coluna escolhida e usa as posições resultantes (valores vazios no final)
+        coluna = df[ordenar_por].reset_index(drop=True)
+        if coluna.dtype == object:
+            # Colunas com tipos misturados (ex.: indicador com "-") não se ordenam direto:
+            # usa os números quando houver, senão o texto
+            numeros = pd.to_numeric(coluna, errors='coerce')
+            coluna = numeros if numeros.notna().any() else coluna.where(coluna.isna(), coluna.astype(str))
+        ordem = coluna.sort_values(ascending=ascendente, kind='stable', na_position='last').index.to_numpy()
+    else:
+        ordem = np.arange(len(df))
+
+    inicio = (pagina - 1) * tamanho_pagina
+    return ordem[inicio:inicio + tamanho_pagina]
+
+
+@st.cache_data(show_spinner=False)
+def _calcular_tons_em_cache(df_gradiente):
+    return calcular_tons(df_gradiente, df_gradiente.columns.tolist())
+
+
+def exibir_tabela_paginada(df, colunas_gradiente=None, cmap='Greens', key='tabela',
+                           ordenar_por=None, ascendente=True, tamanho_pagina=20, height=400,
+                           cache=None, chave_cache=None):
+    """Mostra o DataFrame paginado, estilizando apenas as linhas da página visível.
+
+    Os tons do gradiente são calculados uma vez por tabela: com `cache` e
+    `chave_cache` (a mesma chave usada para guardar `df` no CacheResultados)
+    eles ficam no cache compartilhado; sem eles, no `st.cache_data`.
+    """
+    colunas_gradiente = [c for c in (colunas_gradiente or []) if c in df.columns]
+    colunas = df.columns.tolist()
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        opcoes_ordem = ["(original)"] + colunas
+        indice_ordem = opcoes_ordem.index(ordenar_por) if ordenar_por in colunas else 0
+        coluna_ordem = st.selectbox("Ordenar por", opcoes_ordem, index=indice_ordem, key=f"{key}_ordem")
+
+    with col2:
+        direcao = st.radio(
+            "Direção",
+            ["Crescente", "Decrescente"],
+            index=0 if ascendente else 1,
+            horizontal=True,
+            key=f"{key}_direcao"
+        )
+
+    with col3:
+        opcoes_tamanho = sorted({10, 20, 50, 100, tamanho_pagina})
+        tamanho = st.selectbox(
+            "Linhas por página",
+            opcoes_tamanho,
+            index=opcoes_tamanho.index(tamanho_pagina),
+            key=f"{key}_tamanho"
+        )
+
+    total_paginas = max(1, int(np.ceil(len(df) / tamanho)))
+    with col4:
+        pagina = st.number_input(
+            f"Página (de {total_paginas})",
+            min_value=1,
+            max_value=total_paginas,
+            value=1,
+            step=1,
+            key=f"{key}_pagina"
+        )
+
+    posicoes = paginar(
+        df,
+        int(pagina),
+        tamanho,
+        ordenar_por=None if coluna_ordem == "(original)" else coluna_ordem,
+        ascendente=direcao == "Crescente"
+    )
+    pagina_df = df.iloc[posicoes]
+
+    if colunas_gradiente:
+        # Os tons são calculados sobre a tabela inteira; só a página é estilizada
+        estilos = paleta_gradiente(cmap)
+        if cache is not None and chave_cache is not None:
+            tons = cache.obter_ou_calcular(
+                gerar_chave("tons", chave_cache, colunas_gradiente),
+                lambda: calcular_tons(df, colunas_gradiente)
+            )
+        else:
+            tons = _calcular_tons_em_cache(df[colunas_gradiente])
+
+        css = pd.DataFrame('', index=pagina_df.index, columns=pagina_df.columns)
+        for col in colunas_gradiente:
+            codigos = tons[col][posicoes]
+            css[col] = np.where(codigos >= 0, estilos[np.maximum(codigos, 0)], '')
+
+        st.dataframe(pagina_df.style.apply(lambda _: css, axis=None), height=height)
+    else:
+        st.dataframe(pagina_df, height=height)
+
+    st.caption(f"Mostrando {len(pagina_df)} de {len(df)} linhas")
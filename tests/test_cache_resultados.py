@@ -0,0 +1,189 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cache_resultados import CacheResultados, gerar_chave, hash_conteudo, tamanho_em_bytes
+
+
+def gerar_frame(n, semente=0):
+    rng = np.random.default_rng(semente)
+    return pd.DataFrame({'P/L': rng.normal(size=n), 'ROE': rng.normal(size=n)})
+
+
+def arquivos_pkl(diretorio):
+    return sorted(nome for nome in os.listdir(diretorio) if nome.endswith(".pkl"))
+
+
+def test_chave_depende_do_arquivo_e_da_configuracao():
+    hash_a = hash_conteudo(b"planilha a")
+    hash_b = hash_conteudo(b"planilha b")
+
+    assert gerar_chave("score", hash_a, {'P/L': -1}) == gerar_chave("score", hash_a, {'P/L': -1})
+    assert gerar_chave("score", hash_a, {'P/L': -1}) != gerar_chave("score", hash_b, {'P/L': -1})
+    assert gerar_chave("score", hash_a, {'P/L': -1}) != gerar_chave("score", hash_a, {'P/L': 1})
+
+
+def test_contadores_de_acertos_e_falhas():
+    cache = CacheResultados()
+    chamadas = []
+
+    def calcular():
+        chamadas.append(1)
+        return gerar_frame(10)
+
+    primeiro = cache.obter_ou_calcular("a", calcular)
+    segundo = cache.obter_ou_calcular("a", calcular)
+
+    assert segundo is primeiro
+    assert len(chamadas) == 1
+    stats = cache.estatisticas()
+    assert (stats['acertos'], stats['falhas'], stats['itens']) == (1, 1, 1)
+    assert stats['taxa_acerto'] == 0.5
+
+
+def test_limite_de_memoria_descarta_o_menos_usado():
+    tamanho = tamanho_em_bytes(gerar_frame(100))
+    cache = CacheResultados(limite_memoria=int(tamanho * 2.5))
+
+    cache.guardar("a", gerar_frame(100, 1))
+    cache.guardar("b", gerar_frame(100, 2))
+    cache.obter("a")  # "a" passa a ser o mais recente
+    cache.guardar("c", gerar_frame(100, 3))
+
+    assert len(cache) == 2
+    assert cache.obter("b") is None
+    assert cache.obter("a") is not None
+    assert cache.obter("c") is not None
+    assert cache.memoria_usada <= cache.limite_memoria
+
+
+def test_valor_maior_que_o_limite_nao_e_guardado():
+    cache = CacheResultados(limite_memoria=tamanho_em_bytes(gerar_frame(10)))
+    cache.guardar("pequeno", gerar_frame(10))
+
+    cache.guardar("grande", gerar_frame(1000))
+
+    assert cache.obter("grande") is None
+    assert cache.obter("pequeno") is not None
+    assert cache.memoria_usada == tamanho_em_bytes(gerar_frame(10))
+
+
+def test_disco_sobrevive_a_um_novo_cache(tmp_path):
+    original = gerar_frame(50)
+    CacheResultados(diretorio=str(tmp_path)).guardar("a", original)
+
+    novo = CacheResultados(diretorio=str(tmp_path))
+    recuperado = novo.obter("a")
+
+    pd.testing.assert_frame_equal(recuperado, original)
+    assert novo.estatisticas()['acertos'] == 1
+    assert len(novo) == 1
+
+
+def test_arquivo_corrompido_vira_falha_e_e_removido(tmp_path):
+    cache = CacheResultados(diretorio=str(tmp_path))
+    cache.guardar("a", gerar_frame(10))
+    caminho = tmp_path / "a.pkl"
+    # Texto com UTF-8 inválido: o pickle levanta UnicodeDecodeError
+    caminho.write_bytes(b"\x80\x04X\x02\x00\x00\x00\xc3\x28.")
+
+    novo = CacheResultados(diretorio=str(tmp_path))
+
+    assert novo.obter("a") is None
+    assert not caminho.exists()
+    assert novo.estatisticas()['falhas'] == 1
+
+
+def test_limite_de_disco_remove_os_arquivos_usados_ha_mais_tempo(tmp_path):
+    valor = gerar_frame(200)
+    cache = CacheResultados(diretorio=str(tmp_path), limite_disco=10 ** 9)
+    for i, chave in enumerate(["a", "b", "c"]):
+        cache.guardar(chave, valor)
+        os.utime(tmp_path / f"{chave}.pkl", (1000 + i, 1000 + i))
+    tamanho_arquivo = (tmp_path / "a.pkl").stat().st_size
+
+    # Ler "a" do disco o marca como usado recentemente
+    CacheResultados(diretorio=str(tmp_path), limite_disco=10 ** 9).obter("a")
+
+    # Um novo cache com limite menor limpa o disco ao ser criado
+    CacheResultados(diretorio=str(tmp_path), limite_disco=int(tamanho_arquivo * 2.5))
+
+    assert arquivos_pkl(tmp_path) == ["a.pkl", "c.pkl"]
+
+
+def test_gravacoes_simultaneas_da_mesma_chave(tmp_path):
+    cache = CacheResultados(diretorio=str(tmp_path))
+    valores = [gerar_frame(2000, semente) for semente in range(8)]
+
+    threads = [threading.Thread(target=cache.guardar, args=("a", valor)) for valor in valores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    recuperado = CacheResultados(diretorio=str(tmp_path)).obter("a")
+
+    assert any(recuperado.equals(valor) for valor in valores)
+    assert arquivos_pkl(tmp_path) == ["a.pkl"]
+    assert not [nome for nome in os.listdir(tmp_path) if nome.endswith(".tmp")]
+
+
+def test_calculo_simultaneo_da_mesma_chave_roda_uma_vez(tmp_path):
+    cache = CacheResultados(diretorio=str(tmp_path))
+    chamadas = []
+    iniciou = threading.Event()
+    liberar = threading.Event()
+    resultados = []
+
+    def calcular():
+        chamadas.append(1)
+        iniciou.set()
+        liberar.wait(timeout=5)  # Segura o cálculo até todas as sessões pedirem
+        return gerar_frame(100)
+
+    def sessao():
+        resultados.append(cache.obter_ou_calcular("a", calcular))
+
+    threads = [threading.Thread(target=sessao) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    iniciou.wait(timeout=5)
+    liberar.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(chamadas) == 1
+    assert len(resultados) == 8
+    assert all(resultado is resultados[0] for resultado in resultados)
+    stats = cache.estatisticas()
+    assert (stats['acertos'], stats['falhas']) == (7, 1)
+
+
+def test_none_e_um_resultado_valido():
+    cache = CacheResultados()
+    chamadas = []
+
+    def calcular():
+        chamadas.append(1)
+        return None
+
+    cache.obter_ou_calcular("a", calcular)
+    cache.obter_ou_calcular("a", calcular)
+
+    assert len(chamadas) == 1
+    assert cache.obter("b", padrao="ausente") == "ausente"
+
+
+def test_limpar_apaga_memoria_e_disco(tmp_path):
+    cache = CacheResultados(diretorio=str(tmp_path))
+    cache.guardar("a", gerar_frame(10))
+    cache.obter("a")
+
+    cache.limpar()
+
+    assert cache.obter("a") is None
+    assert arquivos_pkl(tmp_path) == []
+    stats = cache.estatisticas()
+    assert (stats['itens'], stats['memoria_usada'], stats['acertos'], stats['falhas']) == (0, 0, 0, 1)
@@ -0,0 +1,265 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from processamento import aplicar_filtros, calcular_percentis, calcular_score
+
+# Colunas no formato da planilha do Fundamentus
+COLUNAS_BOAS = ['Div.Yield', 'Mrg Ebit', 'Mrg. Líq.', 'Liq. Corr.', 'ROIC', 'ROE', 'Cresc. Rec.5a']
+COLUNAS_RUINS = ['P/L', 'P/VP', 'PSR', 'P/Ativo', 'P/Cap.Giro', 'P/EBIT', 'EV/EBIT', 'EV/EBITDA', 'Dív.Brut/ Patrim.']
+
+PESOS_PADRAO = {'P/L': -1, 'P/VP': -1, 'Div.Yield': 1, 'ROE': 1, 'ROIC': 1, 'Mrg. Líq.': 1}
+
+FILTROS_PADRAO = {
+    'pl_min': 3.0, 'pl_max': 10.0,
+    'pvp_min': 0.5, 'pvp_max': 2.0,
+    'div_min': 5.0, 'div_max': 14.0,
+    'roe_min': 12.0, 'roe_max': 30.0,
+    'liquidez_min': 1.0,
+    'crescimento_min': 10.0
+}
+
+# Pisos de desempenho (linhas pontuadas por segundo)
+LINHAS_DESEMPENHO = 50_000
+PISO_MINMAX = 100_000
+PISO_PERCENTIL = 100_000
+
+SEMENTES = range(10)
+
+
+def gerar_dados(semente, n=300, vazios=0.05, infinitos=0.01):
+    """Gera uma planilha sintética com a mesma estrutura da do Fundamentus."""
+    rng = np.random.default_rng(semente)
+    df = pd.DataFrame({'Papel': [f"PAP{i:04d}" for i in range(n)]})
+    df['Cotação'] = rng.lognormal(3, 1, n)
+
+    for col in COLUNAS_RUINS:
+        df[col] = rng.normal(8, 6, n)
+    for col in COLUNAS_BOAS:
+        df[col] = rng.normal(0.1, 0.15, n)
+    df['Liq.2meses'] = rng.lognormal(14, 2, n)
+    df['Patrim. Líq'] = rng.lognormal(20, 2, n)
+
+    # Valores repetidos para exercitar empates
+    df['P/VP'] = df['P/VP'].round(0)
+
+    # Valores vazios e infinitos espalhados
+    numericas = df.columns.drop('Papel')
+    valores = df[numericas].to_numpy()
+    valores[rng.random(valores.shape) < vazios] = np.nan
+    sinais = rng.choice([-1, 1], valores.shape)
+    mascara_inf = rng.random(valores.shape) < infinitos
+    valores[mascara_inf] = sinais[mascara_inf] * np.inf
+    df[numericas] = valores
+
+    return df
+
+
+def limpar(df):
+    """Limpeza mínima feita antes do score (infinitos viram vazios)."""
+    return df.replace([np.inf, -np.inf], np.nan)
+
+
+def score_referencia_loop(df, selected_cols, weights):
+    """Laço original de Analise4/5.py, usado como referência."""
+    score_df = pd.DataFrame(index=df.index)
+    for col in selected_cols:
+        if df[col].nunique() > 1:
+            normalized = (df[col] - df[col].min()) / (df[col].max() - df[col].min())
+            score_df[col] = normalized * weights.get(col, 0)
+        else:
+            score_df[col] = 0
+    return score_df.sum(axis=1)
+
+
+def score_referencia_analise2(df):
+    """Score de Analise2.calcular_score (MinMaxScaler sobre os dados com fillna(0))."""
+    df_numeric = df.select_dtypes(include=['float64', 'int64']).copy()
+    df_numeric = df_numeric.replace([np.inf, -np.inf], np.nan).fillna(0)
+    amplitude = df_numeric.max() - df_numeric.min()
+    df_normalizado = (df_numeric - df_numeric.min()) / amplitude.where(amplitude != 0, 1)
+    return df_normalizado[COLUNAS_BOAS].sum(axis=1) - df_normalizado[COLUNAS_RUINS].sum(axis=1)
+
+
+def percentis_referencia(df, colunas):
+    """Percentis calculados com o rank do pandas."""
+    valores = limpar(df[colunas])
+    contagem = valores.count()
+    percentis = (valores.rank(method='average') - 1) / (contagem - 1).clip(lower=1)
+    return percentis.where(valores.isna() | (contagem > 1), 0.5)
+
+
+def posicoes(scores):
+    """Posição de cada papel no ranking (empates dividem a mesma posição)."""
+    return scores.round(10).rank(method='min', ascending=False)
+
+
+def verificar_ranking(resultado, esperado):
+    assert resultado['Score'].is_monotonic_decreasing
+    score = resultado['Score'].reindex(esperado.index)
+    np.testing.assert_allclose(score, esperado, rtol=1e-9, atol=1e-12)
+    pd.testing.assert_series_equal(posicoes(score), posicoes(esperado), check_names=False)
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_minmax_reproduz_laco_original(semente):
+    df = limpar(gerar_dados(semente))
+    selected_cols = list(PESOS_PADRAO)
+
+    resultado = calcular_score(df, selected_cols, PESOS_PADRAO)
+
+    verificar_ranking(resultado, score_referencia_loop(df, selected_cols, PESOS_PADRAO))
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_minmax_reproduz_analise2(semente):
+    df = gerar_dados(semente)
+    df_numeric = limpar(df.select_dtypes(include='number')).fillna(0)
+    pesos = {**{col: 1 for col in COLUNAS_BOAS}, **{col: -1 for col in COLUNAS_RUINS}}
+
+    resultado = calcular_score(df_numeric, COLUNAS_BOAS + COLUNAS_RUINS, pesos)
+
+    verificar_ranking(resultado, score_referencia_analise2(df))
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_percentis_iguais_ao_rank_do_pandas(semente):
+    df = gerar_dados(semente)
+    colunas = df.select_dtypes(include='number').columns.tolist()
+
+    percentis = calcular_percentis(df, colunas)
+
+    pd.testing.assert_frame_equal(percentis, percentis_referencia(df, colunas), check_exact=False)
+    assert ((percentis >= 0) & (percentis <= 1) | percentis.isna()).all().all()
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_percentis_invariantes_a_transformacoes_monotonicas(semente):
+    df = limpar(gerar_dados(semente))
+    colunas = COLUNAS_BOAS + COLUNAS_RUINS
+    transformado = df.copy()
+    transformado[colunas] = np.exp(df[colunas] / 10) * 3 + 7
+
+    pd.testing.assert_frame_equal(calcular_percentis(df, colunas), calcular_percentis(transformado, colunas))
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_percentis_nao_sao_afetados_por_outlier(semente):
+    df = limpar(gerar_dados(semente, vazios=0))
+    com_outlier = df.copy()
+    maior = com_outlier['P/L'].idxmax()
+    com_outlier.loc[maior, 'P/L'] = 1e12
+
+    antes = calcular_percentis(df, ['P/L'])
+    depois = calcular_percentis(com_outlier, ['P/L'])
+
+    pd.testing.assert_frame_equal(antes, depois)
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_score_percentil_reproduz_referencia(semente):
+    df = gerar_dados(semente)
+    selected_cols = list(PESOS_PADRAO)
+    percentis = percentis_referencia(df, selected_cols).fillna(0.5)
+    esperado = sum(percentis[col] * peso for col, peso in PESOS_PADRAO.items())
+
+    resultado = calcular_score(df, selected_cols, PESOS_PADRAO, normalizacao='percentil')
+    com_cache = calcular_score(
+        df, selected_cols, PESOS_PADRAO,
+        normalizacao='percentil',
+        percentis=calcular_percentis(df, df.select_dtypes(include='number').columns.tolist())
+    )
+
+    verificar_ranking(resultado, esperado)
+    verificar_ranking(com_cache, esperado)
+
+
+@pytest.mark.parametrize("normalizacao", ['minmax', 'percentil'])
+def test_coluna_constante_nao_altera_ranking(normalizacao):
+    df = limpar(gerar_dados(0))
+    df['ROIC'] = 0.1
+    selected_cols = list(PESOS_PADRAO)
+    sem_constante = [col for col in selected_cols if col != 'ROIC']
+
+    com = calcular_score(df, selected_cols, PESOS_PADRAO, normalizacao=normalizacao)['Score']
+    sem = calcular_score(df, sem_constante, PESOS_PADRAO, normalizacao=normalizacao)['Score']
+
+    assert not com.isna().any()
+    pd.testing.assert_series_equal(posicoes(com), posicoes(sem.reindex(com.index)))
+
+
+@pytest.mark.parametrize("normalizacao", ['minmax', 'percentil'])
+def test_primeira_coluna_constante(normalizacao):
+    df = limpar(gerar_dados(1))
+    df['P/L'] = 5.0
+
+    resultado = calcular_score(df, list(PESOS_PADRAO), PESOS_PADRAO, normalizacao=normalizacao)
+
+    assert len(resultado) == len(df)
+    assert not resultado['Score'].isna().any()
+
+
+@pytest.mark.parametrize("normalizacao", ['minmax', 'percentil'])
+def test_colunas_so_com_vazios_e_infinitos(normalizacao):
+    df = limpar(gerar_dados(2))
+    df['ROE'] = np.nan
+    df.loc[df.index[::2], 'ROE'] = np.inf
+    df = limpar(df)
+
+    resultado = calcular_score(df, list(PESOS_PADRAO), PESOS_PADRAO, normalizacao=normalizacao)
+
+    assert len(resultado) == len(df)
+    assert np.isfinite(resultado['Score']).all()
+
+
+@pytest.mark.parametrize("normalizacao", ['minmax', 'percentil'])
+def test_filtro_sem_resultados(normalizacao):
+    df = limpar(gerar_dados(3))
+    filtros = {**FILTROS_PADRAO, 'pl_min': 1e9, 'pl_max': 2e9}
+
+    filtrado = aplicar_filtros(df, filtros)
+    resultado = calcular_score(filtrado, list(PESOS_PADRAO), PESOS_PADRAO, normalizacao=normalizacao)
+
+    assert filtrado.empty
+    assert resultado.empty
+    assert 'Score' in resultado.columns
+
+
+@pytest.mark.parametrize("semente", SEMENTES)
+def test_filtros_respeitam_limites(semente):
+    df = limpar(gerar_dados(semente, n=2000))
+    df['P/L'] = df['P/L'].abs()
+    df['Div.Yield'] = df['Div.Yield'].abs() / 2
+
+    filtrado = aplicar_filtros(df, FILTROS_PADRAO)
+
+    assert filtrado['P/L'].between(3, 10).all()
+    assert filtrado['P/VP'].between(0.5, 2).all()
+    assert (filtrado['Div.Yield'] * 100).between(5, 14).all()
+    assert (filtrado['ROE'] * 100).between(12, 30).all()
+    assert (filtrado['Liq.2meses'] >= 1e6).all()
+    assert (filtrado['Cresc. Rec.5a'] * 100 >= 10).all()
+
+
+def medir_linhas_por_segundo(funcao, n, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return n / melhor
+
+
+@pytest.mark.parametrize("normalizacao, piso", [('minmax', PISO_MINMAX), ('percentil', PISO_PERCENTIL)])
+def test_desempenho_minimo_do_score(normalizacao, piso):
+    df = limpar(gerar_dados(4, n=LINHAS_DESEMPENHO))
+    selected_cols = list(PESOS_PADRAO)
+
+    linhas_por_segundo = medir_linhas_por_segundo(
+        lambda: calcular_score(df, selected_cols, PESOS_PADRAO, normalizacao=normalizacao),
+        LINHAS_DESEMPENHO
+    )
+
+    assert linhas_por_segundo >= piso, f"{normalizacao}: {linhas_por_segundo:,.0f} linhas/s (mínimo {piso:,})"
@@ -0,0 +1,102 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tabela import NUM_TONS, calcular_tons, paginar, paleta_gradiente
+
+
+def gerar_tabela(n=23, semente=0):
+    rng = np.random.default_rng(semente)
+    df = pd.DataFrame({
+        'Papel': [f"PAP{i:02d}" for i in range(n)],
+        'P/L': rng.normal(8, 4, n),
+    }, index=rng.permutation(n) + 100)  # índice fora de ordem, como depois de um filtro
+    df.iloc[[3, 11], 1] = np.nan
+    return df
+
+
+def cor_de_fundo(estilo):
+    return re.search(r"background-color: (#[0-9a-f]{6})", estilo).group(1)
+
+
+def rgb(cor):
+    return np.array([int(cor[i:i + 2], 16) for i in (1, 3, 5)])
+
+
+@pytest.mark.parametrize("ascendente", [True, False])
+def test_paginas_seguem_a_ordem_do_servidor(ascendente):
+    df = gerar_tabela()
+    tamanho = 5
+
+    posicoes = np.concatenate([paginar(df, pagina, tamanho, 'P/L', ascendente) for pagina in range(1, 6)])
+    valores = df['P/L'].to_numpy()[posicoes]
+
+    esperado = df['P/L'].sort_values(ascending=ascendente, na_position='last').to_numpy()
+    np.testing.assert_array_equal(valores, esperado)
+    assert np.isnan(valores[-2:]).all()
+    assert sorted(posicoes) == list(range(len(df)))
+
+
+def test_ultima_pagina_incompleta():
+    df = gerar_tabela(n=23)
+
+    assert len(paginar(df, 3, 7)) == 7
+    np.testing.assert_array_equal(paginar(df, 4, 7), [21, 22])
+    assert len(paginar(df, 5, 7)) == 0
+
+
+def test_sem_ordenacao_mantem_a_ordem_original():
+    df = gerar_tabela()
+
+    np.testing.assert_array_equal(paginar(df, 2, 10), np.arange(10, 20))
+    np.testing.assert_array_equal(paginar(df, 1, 10, ordenar_por='inexistente'), np.arange(10))
+
+
+def test_coluna_com_tipos_misturados():
+    df = pd.DataFrame({'m': [1, 'a', 2.0, '-', 0.5]})
+
+    np.testing.assert_array_equal(paginar(df, 1, 5, 'm'), [4, 0, 2, 1, 3])
+    np.testing.assert_array_equal(paginar(df, 1, 5, 'm', ascendente=False), [2, 0, 4, 1, 3])
+
+
+def test_coluna_de_texto():
+    df = pd.DataFrame({'Papel': ['VALE3', None, 'ABEV3', 'PETR4']})
+
+    np.testing.assert_array_equal(paginar(df, 1, 4, 'Papel'), [2, 3, 0, 1])
+
+
+def test_tons_nos_extremos_e_valores_invalidos():
+    df = pd.DataFrame({
+        'a': [1.0, 5.0, np.nan, 3.0, np.inf, -np.inf],
+        'constante': [2.0] * 6,
+        'vazia': [np.nan] * 6,
+    })
+
+    tons = calcular_tons(df, ['a', 'constante', 'vazia'])
+
+    np.testing.assert_array_equal(tons['a'], [0, NUM_TONS - 1, -1, NUM_TONS // 2, -1, -1])
+    np.testing.assert_array_equal(tons['constante'], [0] * 6)
+    np.testing.assert_array_equal(tons['vazia'], [-1] * 6)
+
+
+def test_paleta_calculada_uma_vez():
+    assert paleta_gradiente('Greens') is paleta_gradiente('Greens')
+    assert len(paleta_gradiente('Greens')) == NUM_TONS
+
+
+@pytest.mark.parametrize("cmap", ['Greens', 'viridis'])
+def test_cores_iguais_ao_background_gradient(cmap):
+    df = pd.DataFrame({'a': np.linspace(-3, 7, 201), 'b': np.random.default_rng(1).lognormal(size=201)})
+    paleta = paleta_gradiente(cmap)
+    cores_paleta = np.array([rgb(cor_de_fundo(estilo)) for estilo in paleta])
+
+    tons = calcular_tons(df, ['a', 'b'])
+    contexto = df.style.background_gradient(cmap=cmap)._compute().ctx
+
+    for j, col in enumerate(df.columns):
+        for i in range(len(df)):
+            cor_styler = rgb(dict(contexto[(i, j)])['background-color'])
+            mais_proximo = np.abs(cores_paleta - cor_styler).sum(axis=1).argmin()
+            assert abs(int(mais_proximo) - int(tons[col][i])) <= 1, (col, i)